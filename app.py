@@ -31,12 +31,22 @@ app.config["SESSION_COOKIE_SECURE"] = True
 app.config["SESSION_COOKIE_HTTPONLY"] = True
 app.config["SESSION_COOKIE_SAMESITE"] = "Lax"
 app.config["PERMANENT_SESSION_LIFETIME"] = 1800  # 30 minutes
+# Only re-send the cookie when the session changes; last_activity is
+# refreshed often enough to keep the expiry ahead of the idle timeout
+app.config["SESSION_REFRESH_EACH_REQUEST"] = False
+
+# Password hashing, e.g. "scrypt:65536:8:1". Leave unset to tune the scrypt
+# cost to this host at startup (see models.calibrate_password_hash_method)
+app.config["PASSWORD_HASH_METHOD"] = os.environ.get("PASSWORD_HASH_METHOD")
 
 # Initialize the app with the extension
 db.init_app(app)
 
 with app.app_context():
     # Import models to ensure tables are created
-    import models  # noqa: F401
+    import models
     db.create_all()
     logging.info("Database tables created successfully")
+    
+    if not app.config["PASSWORD_HASH_METHOD"]:
+        app.config["PASSWORD_HASH_METHOD"] = models.calibrate_password_hash_method()
@@ -1,219 +1,276 @@
-from datetime import datetime, date
+from datetime import date
 import re
+import string
 
-class FormValidator:
-    """Utility class for form validation."""
+# Pre-compiled patterns used by the validators below
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_NAME_RE = re.compile(r"^[a-zA-Z\s\-']+$")
+
+_VALID_GENDERS = frozenset(('male', 'female', 'other', 'prefer_not_to_say'))
+
+class _NonDigitTable(dict):
+    """str.translate table that deletes every non-digit character."""
     
-    @staticmethod
-    def validate_required_fields(data, required_fields):
-        """Validate that all required fields are present and not empty."""
-        errors = []
-        for field in required_fields:
-            if field not in data or not data[field] or str(data[field]).strip() == '':
-                field_name = field.replace('_', ' ').title()
-                errors.append(f"{field_name} is required")
-        return errors
-    
-    @staticmethod
-    def validate_email(email):
-        """Validate email format."""
-        if not email:
-            return "Email is required"
-        
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(pattern, email):
-            return "Please enter a valid email address"
-        
-        return None
+    def __missing__(self, codepoint):
+        # Non-ASCII code points are classified per call and never stored, so
+        # user input cannot grow the shared table
+        return codepoint if chr(codepoint).isdecimal() else None
+
+_PHONE_DELETE = _NonDigitTable(
+    (c, c if chr(c).isdecimal() else None) for c in range(128)
+)
+
+# Character classes for the single-pass password strength check
+_UPPER_CHARS = frozenset(string.ascii_uppercase)
+_LOWER_CHARS = frozenset(string.ascii_lowercase)
+_SPECIAL_CHARS = frozenset("!@#$%^&*()_+-=[]{};':\"\\|,.<>/?")
+
+def _parse_ymd(value):
+    """Parse a ``YYYY-MM-DD`` string into a date.
     
-    @staticmethod
-    def validate_phone(phone):
-        """Validate phone number."""
-        if not phone:
-            return "Phone number is required"
-        
-        # Remove any formatting characters
-        digits_only = re.sub(r'\D', '', phone)
-        
-        if len(digits_only) < 10:
-            return "Phone number must be at least 10 digits"
-        
-        if len(digits_only) > 15:
-            return "Phone number is too long"
-        
-        return None
+    Fast replacement for ``datetime.strptime(value, '%Y-%m-%d').date()``
+    for the zero-padded format sent by HTML date inputs.
+    """
+    digits = value[:4] + value[5:7] + value[8:]
+    if (len(value) != 10 or value[4] != '-' or value[7] != '-'
+            or not digits.isascii() or not digits.isdigit()):
+        raise ValueError(f"Invalid date format: {value!r}")
+    return date(int(value[:4]), int(value[5:7]), int(value[8:]))
+
+def _years_before(day, years):
+    """Return the same calendar day ``years`` earlier (Feb 29 maps to Feb 28)."""
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:
+        return day.replace(year=day.year - years, day=28)
+
+# Field validators. These are module-level functions so the form classes
+# can call them directly; FormValidator re-exposes them as its public API.
+
+def _validate_required_fields(data, required_fields):
+    """Validate that all required fields are present and not empty."""
+    errors = []
+    for field in required_fields:
+        if field not in data or not data[field] or str(data[field]).strip() == '':
+            field_name = field.replace('_', ' ').title()
+            errors.append(f"{field_name} is required")
+    return errors
+
+def _validate_email(email):
+    """Validate email format."""
+    if not email:
+        return "Email is required"
     
-    @staticmethod
-    def validate_password(password):
-        """Validate password strength."""
-        if not password:
-            return "Password is required"
-        
-        if len(password) < 8:
-            return "Password must be at least 8 characters long"
-        
-        if not re.search(r"[A-Z]", password):
-            return "Password must contain at least one uppercase letter"
-        
-        if not re.search(r"[a-z]", password):
-            return "Password must contain at least one lowercase letter"
-        
-        if not re.search(r"\d", password):
-            return "Password must contain at least one number"
-        
-        if not re.search(r"[!@#$%^&*()_+\-=\[\]{};':\"\\|,.<>\/?]", password):
-            return "Password must contain at least one special character (!@#$%^&*)"
-        
-        return None
+    if not _EMAIL_RE.match(email):
+        return "Please enter a valid email address"
     
-    @staticmethod
-    def validate_date_of_birth(dob_str):
-        """Validate date of birth."""
-        if not dob_str:
-            return "Date of birth is required"
-        
-        try:
-            dob = datetime.strptime(dob_str, '%Y-%m-%d').date()
-            
-            # Check if date is not in the future
-            if dob > date.today():
-                return "Date of birth cannot be in the future"
-            
-            # Check minimum age (13 years for privacy compliance)
-            today = date.today()
-            age = today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
-            
-            if age < 13:
-                return "Patient must be at least 13 years old"
-            
-            if age > 120:
-                return "Please enter a valid date of birth"
-            
-            return None
-            
-        except ValueError:
-            return "Please enter a valid date in YYYY-MM-DD format"
-    
-    @staticmethod
-    def validate_name(name, field_name):
-        """Validate name fields."""
-        if not name:
-            return f"{field_name} is required"
-        
-        if len(name.strip()) < 2:
-            return f"{field_name} must be at least 2 characters long"
-        
-        if len(name.strip()) > 50:
-            return f"{field_name} must be less than 50 characters"
-        
-        # Only allow letters, spaces, hyphens, and apostrophes
-        if not re.match(r"^[a-zA-Z\s\-']+$", name):
-            return f"{field_name} can only contain letters, spaces, hyphens, and apostrophes"
-        
-        return None
+    return None
+
+def _validate_phone(phone):
+    """Validate phone number."""
+    if not phone:
+        return "Phone number is required"
     
-    @staticmethod
-    def validate_gender(gender):
-        """Validate gender selection."""
-        valid_genders = ['male', 'female', 'other', 'prefer_not_to_say']
-        
-        if not gender:
-            return "Gender is required"
-        
-        if gender.lower() not in valid_genders:
-            return "Please select a valid gender option"
-        
-        return None
+    # Remove any formatting characters
+    digits_only = phone.translate(_PHONE_DELETE)
     
-    @staticmethod
-    def validate_address(address):
-        """Validate address."""
-        if not address:
-            return "Address is required"
-        
-        if len(address.strip()) < 10:
-            return "Please enter a complete address"
-        
-        if len(address.strip()) > 200:
-            return "Address is too long"
-        
-        return None
+    if len(digits_only) < 10:
+        return "Phone number must be at least 10 digits"
+    
+    if len(digits_only) > 15:
+        return "Phone number is too long"
+    
+    return None
+
+def _validate_password(password):
+    """Validate password strength."""
+    if not password:
+        return "Password is required"
+    
+    if len(password) < 8:
+        return "Password must be at least 8 characters long"
+    
+    # Check all character classes in a single pass over the password
+    has_upper = has_lower = has_digit = has_special = False
+    for char in password:
+        if char in _UPPER_CHARS:
+            has_upper = True
+        elif char in _LOWER_CHARS:
+            has_lower = True
+        elif char.isdecimal():  # matches \d, which includes non-ASCII digits
+            has_digit = True
+        elif char in _SPECIAL_CHARS:
+            has_special = True
+        if has_upper and has_lower and has_digit and has_special:
+            break
+    
+    if not has_upper:
+        return "Password must contain at least one uppercase letter"
+    
+    if not has_lower:
+        return "Password must contain at least one lowercase letter"
+    
+    if not has_digit:
+        return "Password must contain at least one number"
+    
+    if not has_special:
+        return "Password must contain at least one special character (!@#$%^&*)"
+    
+    return None
+
+def _validate_date_of_birth(dob_str):
+    """Validate date of birth."""
+    return _parse_date_of_birth(dob_str)[1]
+
+def _parse_date_of_birth(dob_str):
+    """Parse and validate date of birth.
+    
+    Returns a ``(date, error)`` tuple; ``date`` is None when invalid.
+    """
+    if not dob_str:
+        return None, "Date of birth is required"
+    
+    try:
+        dob = _parse_ymd(dob_str)
+    except ValueError:
+        return None, "Please enter a valid date in YYYY-MM-DD format"
+    
+    today = date.today()
+    
+    # Check if date is not in the future
+    if dob > today:
+        return None, "Date of birth cannot be in the future"
+    
+    # Check minimum age (13 years for privacy compliance)
+    if dob > _years_before(today, 13):
+        return None, "Patient must be at least 13 years old"
+    
+    # Anyone born on or before their 121st birthday is over 120
+    if dob <= _years_before(today, 121):
+        return None, "Please enter a valid date of birth"
+    
+    return dob, None
+
+def _validate_name(name, field_name):
+    """Validate name fields."""
+    if not name:
+        return f"{field_name} is required"
+    
+    length = len(name.strip())
+    
+    if length < 2:
+        return f"{field_name} must be at least 2 characters long"
+    
+    if length > 50:
+        return f"{field_name} must be less than 50 characters"
+    
+    # Only allow letters, spaces, hyphens, and apostrophes
+    if not _NAME_RE.match(name):
+        return f"{field_name} can only contain letters, spaces, hyphens, and apostrophes"
+    
+    return None
+
+def _validate_gender(gender):
+    """Validate gender selection."""
+    if not gender:
+        return "Gender is required"
+    
+    # Select options are already lowercase; only lower on a miss
+    if gender not in _VALID_GENDERS and gender.lower() not in _VALID_GENDERS:
+        return "Please select a valid gender option"
+    
+    return None
+
+def _validate_address(address):
+    """Validate address."""
+    if not address:
+        return "Address is required"
+    
+    length = len(address.strip())
+    
+    if length < 10:
+        return "Please enter a complete address"
+    
+    if length > 200:
+        return "Address is too long"
+    
+    return None
+
+class FormValidator:
+    """Utility class for form validation."""
+    
+    validate_required_fields = staticmethod(_validate_required_fields)
+    validate_email = staticmethod(_validate_email)
+    validate_phone = staticmethod(_validate_phone)
+    validate_password = staticmethod(_validate_password)
+    validate_date_of_birth = staticmethod(_validate_date_of_birth)
+    parse_date_of_birth = staticmethod(_parse_date_of_birth)
+    validate_name = staticmethod(_validate_name)
+    validate_gender = staticmethod(_validate_gender)
+    validate_address = staticmethod(_validate_address)
 
 class RegistrationForm:
     """Handle patient registration form validation."""
     
+    # (field, validator, extra validator args, error prefix) in display order.
+    # Fields without a validator only need to be present; fields listed in
+    # _PARSED_FIELDS use a parser returning (value, error) instead.
+    _FIELDS = (
+        ('first_name', _validate_name, ('First name',), None),
+        ('last_name', _validate_name, ('Last name',), None),
+        ('email', _validate_email, (), None),
+        ('phone', _validate_phone, (), None),
+        ('date_of_birth', _parse_date_of_birth, (), None),
+        ('gender', _validate_gender, (), None),
+        ('address', _validate_address, (), None),
+        ('emergency_contact_name', _validate_name, ('Emergency contact name',), None),
+        ('emergency_contact_phone', _validate_phone, (), 'Emergency contact '),
+        ('password', _validate_password, (), None),
+        ('confirm_password', None, (), None),
+    )
+    _PARSED_FIELDS = frozenset(('date_of_birth',))
+    
     def __init__(self, form_data):
         self.data = form_data
         self.errors = []
+        self.parsed = {}
+        self.clean = {}
     
     def validate(self):
         """Validate all registration form fields."""
         self.errors = []
+        self.parsed = {}
+        self.clean = {}
+        data = self.data
         
-        # Required fields validation
-        required_fields = [
-            'first_name', 'last_name', 'email', 'phone', 'date_of_birth',
-            'gender', 'address', 'emergency_contact_name', 'emergency_contact_phone',
-            'password', 'confirm_password'
-        ]
-        
-        self.errors.extend(FormValidator.validate_required_fields(self.data, required_fields))
-        
-        # Individual field validations
-        if 'first_name' in self.data:
-            error = FormValidator.validate_name(self.data['first_name'], 'First name')
-            if error:
-                self.errors.append(error)
-        
-        if 'last_name' in self.data:
-            error = FormValidator.validate_name(self.data['last_name'], 'Last name')
-            if error:
-                self.errors.append(error)
-        
-        if 'email' in self.data:
-            error = FormValidator.validate_email(self.data['email'])
-            if error:
-                self.errors.append(error)
-        
-        if 'phone' in self.data:
-            error = FormValidator.validate_phone(self.data['phone'])
-            if error:
-                self.errors.append(error)
-        
-        if 'date_of_birth' in self.data:
-            error = FormValidator.validate_date_of_birth(self.data['date_of_birth'])
-            if error:
-                self.errors.append(error)
-        
-        if 'gender' in self.data:
-            error = FormValidator.validate_gender(self.data['gender'])
-            if error:
-                self.errors.append(error)
-        
-        if 'address' in self.data:
-            error = FormValidator.validate_address(self.data['address'])
-            if error:
-                self.errors.append(error)
-        
-        if 'emergency_contact_name' in self.data:
-            error = FormValidator.validate_name(self.data['emergency_contact_name'], 'Emergency contact name')
-            if error:
-                self.errors.append(error)
-        
-        if 'emergency_contact_phone' in self.data:
-            error = FormValidator.validate_phone(self.data['emergency_contact_phone'])
-            if error:
-                self.errors.append('Emergency contact ' + error.lower())
-        
-        if 'password' in self.data:
-            error = FormValidator.validate_password(self.data['password'])
+        for field, validator, args, prefix in self._FIELDS:
+            value = data.get(field)
+            
+            # Required check; a missing field skips its format validation
+            stripped = str(value).strip() if value else ''
+            if not stripped:
+                self.errors.append(f"{field.replace('_', ' ').title()} is required")
+                continue
+            self.clean[field] = stripped
+            
+            if field in self._PARSED_FIELDS:
+                # Keep the parsed value so callers don't parse it again
+                parsed, error = validator(value, *args)
+                if error is None:
+                    self.parsed[field] = parsed
+            elif validator:
+                error = validator(value, *args)
+            else:
+                continue
+            
             if error:
-                self.errors.append(error)
+                self.errors.append(prefix + error.lower() if prefix else error)
         
         # Password confirmation validation
-        if 'password' in self.data and 'confirm_password' in self.data:
-            if self.data['password'] != self.data['confirm_password']:
-                self.errors.append("Passwords do not match")
+        password = data.get('password')
+        confirm_password = data.get('confirm_password')
+        if password and confirm_password and password != confirm_password:
+            self.errors.append("Passwords do not match")
         
         return len(self.errors) == 0
     
@@ -227,17 +284,22 @@ class LoginForm:
     def __init__(self, form_data):
         self.data = form_data
         self.errors = []
+        self.email = None
     
     def validate(self):
         """Validate login form fields."""
         self.errors = []
+        self.email = None
         
         if not self.data.get('email'):
             self.errors.append("Email is required")
         else:
-            error = FormValidator.validate_email(self.data['email'])
+            error = _validate_email(self.data['email'])
             if error:
                 self.errors.append(error)
+            else:
+                # Normalized address used for the account lookup
+                self.email = self.data['email'].strip().lower()
         
         if not self.data.get('password'):
             self.errors.append("Password is required")
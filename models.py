@@ -1,8 +1,32 @@
 from datetime import datetime
+from flask import current_app
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
 from app import db
+import logging
 import re
+import time
+
+# Bounds for auto-tuning the scrypt work factor: never weaker than Werkzeug's
+# default, and capped so one hash needs at most 128 MiB of memory
+SCRYPT_MIN_N = 2 ** 15
+SCRYPT_MAX_N = 2 ** 17
+TARGET_HASH_SECONDS = 0.25
+
+def calibrate_password_hash_method():
+    """Pick the largest scrypt cost that hashes within the target time on this host."""
+    n = SCRYPT_MIN_N
+    while n < SCRYPT_MAX_N:
+        start = time.perf_counter()
+        generate_password_hash("calibration-password", method=f"scrypt:{n}:8:1")
+        # Doubling n roughly doubles the hashing time
+        if (time.perf_counter() - start) * 2 > TARGET_HASH_SECONDS:
+            break
+        n *= 2
+    
+    method = f"scrypt:{n}:8:1"
+    logging.info("Password hashing calibrated to %s", method)
+    return method
 
 class Patient(db.Model):
     __tablename__ = 'patients'
@@ -25,7 +49,7 @@ class Patient(db.Model):
     
     def set_password(self, password):
         """Hash and set the password."""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = generate_password_hash(password, method=current_app.config["PASSWORD_HASH_METHOD"])
     
     def check_password(self, password):
         """Check if provided password matches the hash."""
@@ -1,28 +1,36 @@
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from flask import render_template, request, redirect, url_for, flash, session, jsonify
+from markupsafe import Markup
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import load_only
 from app import app, db
 from models import Patient
 from forms import RegistrationForm, LoginForm
 import logging
+import time
 
 # Configure session timeout
-@app.before_request
-def make_session_permanent():
-    """Make session permanent and handle timeout."""
-    session.permanent = True
-
 @app.before_request
 def check_session_timeout():
     """Check if session has timed out."""
     if 'patient_id' in session:
-        if 'last_activity' in session:
-            time_since_activity = datetime.utcnow() - datetime.fromisoformat(session['last_activity'])
-            if time_since_activity.total_seconds() > 1800:  # 30 minutes
+        now = int(time.time())
+        last_activity = session.get('last_activity')
+        # Sessions created before the switch to epoch seconds hold an ISO
+        # string; those simply get a fresh timestamp below
+        if isinstance(last_activity, int):
+            seconds_since_activity = now - last_activity
+            if seconds_since_activity > 1800:  # 30 minutes
                 session.clear()
                 flash('Your session has expired. Please log in again.', 'warning')
                 return redirect(url_for('login'))
+            
+            # Only refresh the timestamp once a minute to avoid rewriting the
+            # session cookie on every request
+            if seconds_since_activity < 60:
+                return
         
-        session['last_activity'] = datetime.utcnow().isoformat()
+        session['last_activity'] = now
 
 def login_required(f):
     """Decorator to require login for protected routes."""
@@ -53,24 +61,19 @@ def register():
         form = RegistrationForm(request.form)
         
         if form.validate():
-            # Check if email already exists
-            existing_patient = Patient.query.filter_by(email=request.form['email']).first()
-            if existing_patient:
-                flash('An account with this email already exists. Please use a different email or log in.', 'danger')
-                return render_template('register.html')
-            
             try:
                 # Create new patient
+                clean = form.clean
                 patient = Patient(
-                    first_name=request.form['first_name'].strip(),
-                    last_name=request.form['last_name'].strip(),
-                    email=request.form['email'].strip().lower(),
-                    phone=request.form['phone'].strip(),
-                    date_of_birth=datetime.strptime(request.form['date_of_birth'], '%Y-%m-%d').date(),
+                    first_name=clean['first_name'],
+                    last_name=clean['last_name'],
+                    email=clean['email'].lower(),
+                    phone=clean['phone'],
+                    date_of_birth=form.parsed['date_of_birth'],
                     gender=request.form['gender'],
-                    address=request.form['address'].strip(),
-                    emergency_contact_name=request.form['emergency_contact_name'].strip(),
-                    emergency_contact_phone=request.form['emergency_contact_phone'].strip()
+                    address=clean['address'],
+                    emergency_contact_name=clean['emergency_contact_name'],
+                    emergency_contact_phone=clean['emergency_contact_phone']
                 )
                 
                 patient.set_password(request.form['password'])
@@ -78,17 +81,22 @@ def register():
                 db.session.add(patient)
                 db.session.commit()
                 
-                logging.info(f"New patient registered: {patient.email}")
+                logging.info("New patient registered: %s", patient.email)
                 flash('Registration successful! Please log in with your credentials.', 'success')
                 return redirect(url_for('login'))
                 
+            except IntegrityError:
+                # The unique index on email rejects duplicate accounts
+                db.session.rollback()
+                flash('An account with this email already exists. Please use a different email or log in.', 'danger')
+                
             except Exception as e:
                 db.session.rollback()
-                logging.error(f"Registration error: {str(e)}")
+                logging.error("Registration error: %s", e)
                 flash('An error occurred during registration. Please try again.', 'danger')
         else:
-            for error in form.get_errors():
-                flash(error, 'danger')
+            # One flash per form keeps it to a single session write
+            flash(Markup('<br>').join(form.get_errors()), 'danger')
     
     return render_template('register.html')
 
@@ -102,22 +110,25 @@ def login():
         form = LoginForm(request.form)
         
         if form.validate():
-            email = request.form['email'].strip().lower()
             password = request.form['password']
             
-            patient = Patient.query.filter_by(email=email).first()
+            patient = Patient.query.filter_by(email=form.email).first()
             
             if patient and patient.check_password(password):
                 if patient.is_active:
                     session['patient_id'] = patient.id
+                    session.permanent = True
                     session['patient_name'] = patient.full_name
-                    session['last_activity'] = datetime.utcnow().isoformat()
+                    session['last_activity'] = int(time.time())
                     
-                    # Update last login time
-                    patient.last_login = datetime.utcnow()
-                    db.session.commit()
+                    # Update last login time, skipping the write (and commit)
+                    # when the recorded login is only a few minutes old
+                    now = datetime.utcnow()
+                    if not patient.last_login or now - patient.last_login > timedelta(minutes=5):
+                        patient.last_login = now
+                        db.session.commit()
                     
-                    logging.info(f"Patient logged in: {patient.email}")
+                    logging.info("Patient logged in: %s", patient.email)
                     flash(f'Welcome back, {patient.first_name}!', 'success')
                     return redirect(url_for('dashboard'))
                 else:
@@ -125,8 +136,8 @@ def login():
             else:
                 flash('Invalid email or password. Please try again.', 'danger')
         else:
-            for error in form.get_errors():
-                flash(error, 'danger')
+            # One flash per form keeps it to a single session write
+            flash(Markup('<br>').join(form.get_errors()), 'danger')
     
     return render_template('login.html')
 
@@ -134,7 +145,7 @@ def login():
 def logout():
     """Log out the current patient."""
     if 'patient_id' in session:
-        logging.info(f"Patient logged out: {session.get('patient_name', 'Unknown')}")
+        logging.info("Patient logged out: %s", session.get('patient_name', 'Unknown'))
     
     session.clear()
     flash('You have been logged out successfully.', 'info')
@@ -144,7 +155,7 @@ def logout():
 @login_required
 def dashboard():
     """Patient dashboard - main page after login."""
-    patient = Patient.query.get(session['patient_id'])
+    patient = db.session.get(Patient, session['patient_id'])
     
     if not patient:
         session.clear()
@@ -157,7 +168,7 @@ def dashboard():
 @login_required
 def profile():
     """Patient profile management."""
-    patient = Patient.query.get(session['patient_id'])
+    patient = db.session.get(Patient, session['patient_id'])
     
     if not patient:
         session.clear()
@@ -181,11 +192,11 @@ def profile():
             session['patient_name'] = patient.full_name
             
             flash('Profile updated successfully!', 'success')
-            logging.info(f"Profile updated for patient: {patient.email}")
+            logging.info("Profile updated for patient: %s", patient.email)
             
         except Exception as e:
             db.session.rollback()
-            logging.error(f"Profile update error: {str(e)}")
+            logging.error("Profile update error: %s", e)
             flash('An error occurred while updating your profile. Please try again.', 'danger')
     
     return render_template('profile.html', patient=patient)
@@ -194,7 +205,11 @@ def profile():
 @login_required
 def change_password():
     """Change patient password."""
-    patient = Patient.query.get(session['patient_id'])
+    # Only the hash and email are read here; skip the rest of the row
+    patient = db.session.get(
+        Patient, session['patient_id'],
+        options=[load_only(Patient.password_hash, Patient.email)]
+    )
     
     if not patient:
         session.clear()
@@ -230,11 +245,11 @@ def change_password():
         db.session.commit()
         
         flash('Password changed successfully!', 'success')
-        logging.info(f"Password changed for patient: {patient.email}")
+        logging.info("Password changed for patient: %s", patient.email)
         
     except Exception as e:
         db.session.rollback()
-        logging.error(f"Password change error: {str(e)}")
+        logging.error("Password change error: %s", e)
         flash('An error occurred while changing your password. Please try again.', 'danger')
     
     return redirect(url_for('profile'))